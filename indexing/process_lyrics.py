@@ -270,7 +270,8 @@ class LyricsProcessor:
                     # Run sync batch insert in thread pool
                     success, errors = await asyncio.to_thread(
                         batch_insert_objects,
-                        objects_to_insert
+                        objects_to_insert,
+                        client=self.weaviate_client
                     )
                     success_count += success
                     error_count += errors
@@ -7,60 +7,146 @@ Analyze failed records from error log.
 Shows which IDs failed, why, and provides statistics.
 """
 
-import json
+import heapq
+import pickle
 import sys
-from collections import Counter, defaultdict
+from collections import Counter
 from datetime import datetime
+from operator import itemgetter
 import os
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
-def load_errors(error_log_file="processing_errors.jsonl"):
-    """Load all errors from the error log file"""
-    errors = []
+RECENT_ERRORS_LIMIT = 10
+READ_CHUNK_SIZE = 4 << 20
+
+
+def iter_errors(error_log_file="processing_errors.jsonl", report=None):
+    """
+    Yield errors from the error log file one at a time.
+    
+    Reads raw bytes in 4 MiB chunks and splits on newlines, carrying the
+    unfinished last line over to the next chunk. Malformed lines are skipped
+    and counted. If `report` is a dict, it receives 'bad_lines' and
+    'complete' (False when reading stopped early) for the caller.
+    """
+    if report is None:
+        report = {}
+    report.update(bad_lines=0, complete=False)
     
     if not os.path.exists(error_log_file):
-        return errors
+        report['complete'] = True
+        return
+    
+    def parse(line):
+        try:
+            return json_loads(line)
+        except ValueError:
+            report['bad_lines'] += 1
+            return None
     
     try:
-        with open(error_log_file, 'r') as f:
-            for line in f:
-                if line.strip():
-                    errors.append(json.loads(line))
-        return errors
+        with open(error_log_file, 'rb') as f:
+            tail = b''
+            while chunk := f.read(READ_CHUNK_SIZE):
+                chunk = tail + chunk
+                cut = chunk.rfind(b'\n') + 1
+                tail = chunk[cut:]
+                for line in chunk[:cut].splitlines():
+                    if line.strip() and (error := parse(line)) is not None:
+                        yield error
+            if tail.strip() and (error := parse(tail)) is not None:
+                yield error
+        report['complete'] = True
     except Exception as e:
         print(f"❌ Error loading error log: {e}")
-        return []
+    
+    if report['bad_lines']:
+        print(f"⚠️  Skipped {report['bad_lines']} malformed line(s) in {error_log_file}")
+
+
+def load_errors(error_log_file="processing_errors.jsonl"):
+    """Load all errors from the error log file"""
+    return list(iter_errors(error_log_file))
 
 
 def analyze_errors(errors):
-    """Analyze errors and return statistics"""
-    if not errors:
-        return None
+    """
+    Analyze errors and return statistics.
     
-    # Count by error type
-    error_types = Counter(e['error_type'] for e in errors)
+    Consumes `errors` in a single pass, so it can be a generator from
+    iter_errors() - only the aggregates are kept in memory.
+    """
+    error_types = Counter()
+    sessions = set()
+    failed_ids = set()
     
-    # Group by session
-    sessions = defaultdict(list)
-    for e in errors:
-        sessions[e['session_start']].append(e)
+    def tally(errors):
+        # Update the aggregates as nlargest() consumes the stream
+        for e in errors:
+            error_types[e['error_type']] += 1
+            sessions.add(e['session_start'])
+            failed_ids.add(e['song_id'])
+            yield e
     
-    # Recent errors (last 10)
-    recent = sorted(errors, key=lambda x: x['timestamp'], reverse=True)[:10]
+    # Recent errors (last 10): O(N log 10) instead of sorting everything
+    recent = heapq.nlargest(RECENT_ERRORS_LIMIT, tally(errors), key=itemgetter('timestamp'))
+    total_errors = sum(error_types.values())
     
-    # Unique failed IDs
-    failed_ids = set(e['song_id'] for e in errors)
+    if not total_errors:
+        return None
     
     return {
-        'total_errors': len(errors),
+        'total_errors': total_errors,
         'error_types': error_types,
         'sessions': len(sessions),
         'recent_errors': recent,
         'failed_ids': failed_ids,
-        'latest_session': max(sessions.keys()) if sessions else None
+        'latest_session': max(sessions)
     }
 
 
+def load_error_stats(error_log_file="processing_errors.jsonl"):
+    """
+    Return analyze_errors() statistics for the log, using a cached snapshot.
+    
+    The stats are pickled to '<log>.cache' keyed on the log's size and
+    mtime; the log is only re-read when it has changed since the snapshot.
+    """
+    if not os.path.exists(error_log_file):
+        return None
+    
+    st = os.stat(error_log_file)
+    cache_key = (st.st_size, st.st_mtime_ns)
+    cache_file = f"{error_log_file}.cache"
+    
+    try:
+        with open(cache_file, 'rb') as f:
+            cached_key, stats = pickle.load(f)
+        if cached_key == cache_key:
+            return stats
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        pass
+    
+    report = {}
+    stats = analyze_errors(iter_errors(error_log_file, report))
+    
+    # Never cache stats from a partial read - the warning must show on every run
+    if not report['complete'] or report['bad_lines']:
+        return stats
+    
+    try:
+        with open(cache_file, 'wb') as f:
+            pickle.dump((cache_key, stats), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass
+    
+    return stats
+
+
 def print_error_summary(stats):
     """Print formatted error summary"""
     print("=" * 70)
@@ -98,9 +184,9 @@ def print_error_summary(stats):
         print()
 
 
-def export_failed_ids(errors, output_file="failed_ids.txt"):
+def export_failed_ids(failed_ids, output_file="failed_ids.txt"):
     """Export list of failed IDs to a text file"""
-    failed_ids = sorted(set(e['song_id'] for e in errors))
+    failed_ids = sorted(failed_ids)
     
     try:
         with open(output_file, 'w') as f:
@@ -180,17 +266,14 @@ def main():
         print("\n   Error tracking will begin when process_lyrics.py runs.")
         return 0
     
-    # Load errors
+    # Load and analyze errors (cached until the log changes)
     print(f"\n📂 Loading errors from: {error_log_file}")
-    errors = load_errors(error_log_file)
+    stats = load_error_stats(error_log_file)
     
-    if not errors:
+    if not stats:
         print("\n✅ Error log is empty - no failures recorded!")
         return 0
     
-    # Analyze errors
-    stats = analyze_errors(errors)
-    
     # Print summary
     print_error_summary(stats)
     
@@ -210,11 +293,11 @@ def main():
             choice = input("\nEnter choice (1-5): ").strip()
             
             if choice == '1':
-                export_failed_ids(errors)
+                export_failed_ids(stats['failed_ids'])
             
             elif choice == '2':
                 song_id = input("Enter song ID: ").strip()
-                search_errors_by_id(errors, song_id)
+                search_errors_by_id(iter_errors(error_log_file), song_id)
             
             elif choice == '3':
                 print("\nAvailable error types:")
@@ -222,7 +305,7 @@ def main():
                     print(f"  {i}. {error_type} ({count:,} errors)")
                 
                 error_type = input("\nEnter error type: ").strip()
-                search_errors_by_type(errors, error_type)
+                search_errors_by_type(iter_errors(error_log_file), error_type)
             
             elif choice == '4':
                 print("\n📋 All Error Types:")
@@ -12,10 +12,63 @@ import numpy as np
 import config
 from tqdm import tqdm
 
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+except ImportError:
+    pa = None  # Fall back to the pandas C parser
 
-def estimate_tokens(text):
-    """Estimate token count (1 token ≈ 4 characters)"""
-    return len(str(text)) // 4
+# Quantiles reported per statistic (one partition pass per array)
+QUANTILES = [0.25, 0.5, 0.75, 0.95, 0.99]
+
+# Rows per chunk when the pandas fallback reads the full CSV
+CSV_CHUNK_ROWS = 1_000_000
+
+# Bytes parsed per pyarrow block (lyrics rows are large, keep blocks big)
+CSV_BLOCK_SIZE = 16 << 20
+
+
+def read_lyrics_csv(csv_path, sample_size=None):
+    """
+    Read only the lyrics column from the CSV.
+    
+    Uses pyarrow's multithreaded reader when available, keeping lyrics in
+    Arrow string buffers. For samples, record batches are streamed until
+    enough rows are read so the rest of the file is never parsed.
+    """
+    if pa is None:
+        read_kwargs = dict(usecols=['lyrics'], dtype={'lyrics': 'string'}, engine='c')
+        if sample_size:
+            return pd.read_csv(csv_path, nrows=sample_size, **read_kwargs)
+        chunks = pd.read_csv(csv_path, chunksize=CSV_CHUNK_ROWS, **read_kwargs)
+        return pd.concat(list(tqdm(chunks, desc="Reading CSV", unit="chunk")), ignore_index=True)
+    
+    read_options = pacsv.ReadOptions(use_threads=True, block_size=CSV_BLOCK_SIZE)
+    parse_options = pacsv.ParseOptions(newlines_in_values=True)
+    convert_options = pacsv.ConvertOptions(
+        include_columns=['lyrics'],
+        column_types={'lyrics': pa.string()}
+    )
+    
+    if sample_size:
+        reader = pacsv.open_csv(csv_path, read_options=read_options,
+                                parse_options=parse_options,
+                                convert_options=convert_options)
+        batches = []
+        rows = 0
+        for batch in reader:
+            batches.append(batch)
+            rows += batch.num_rows
+            if rows >= sample_size:
+                break
+        table = pa.Table.from_batches(batches, schema=reader.schema).slice(0, sample_size)
+    else:
+        table = pacsv.read_csv(csv_path, read_options=read_options,
+                               parse_options=parse_options,
+                               convert_options=convert_options)
+    
+    string_dtype = pd.StringDtype("pyarrow")
+    return table.to_pandas(types_mapper={pa.string(): string_dtype}.get)
 
 
 def analyze_lyrics_distribution(sample_size=100000):
@@ -41,11 +94,7 @@ def analyze_lyrics_distribution(sample_size=100000):
     print(f"\n📖 Reading CSV (sample_size={sample_size if sample_size else 'ALL'})...")
     
     try:
-        if sample_size:
-            df = pd.read_csv(csv_path, nrows=sample_size)
-        else:
-            df = pd.read_csv(csv_path)
-        
+        df = read_lyrics_csv(csv_path, sample_size)
         print(f"✓ Loaded {len(df):,} rows")
     except Exception as e:
         print(f"❌ Error reading CSV: {e}")
@@ -53,29 +102,17 @@ def analyze_lyrics_distribution(sample_size=100000):
     
     print("\n📊 Analyzing lyrics sizes...")
     
-    # Calculate sizes
-    stats = {
-        'char_lengths': [],
-        'word_counts': [],
-        'estimated_tokens': []
-    }
-    
-    for idx, row in tqdm(df.iterrows(), total=len(df), desc="Processing"):
-        lyrics = str(row.get('lyrics', ''))
-        
-        if lyrics and lyrics != 'nan':
-            chars = len(lyrics)
-            words = len(lyrics.split())
-            tokens = estimate_tokens(lyrics)
-            
-            stats['char_lengths'].append(chars)
-            stats['word_counts'].append(words)
-            stats['estimated_tokens'].append(tokens)
-    
-    # Convert to numpy arrays for statistics
-    chars = np.array(stats['char_lengths'])
-    words = np.array(stats['word_counts'])
-    tokens = np.array(stats['estimated_tokens'])
+    # Calculate sizes with vectorized string ops (no per-row Python loop)
+    lyrics = df['lyrics']
+    if not isinstance(lyrics.dtype, pd.StringDtype):
+        lyrics = lyrics.astype('string')
+    lyrics = lyrics.fillna('')
+    all_chars = lyrics.str.len().to_numpy(dtype=np.int64)
+    has_lyrics = all_chars > 0
+    
+    chars = all_chars[has_lyrics]
+    words = lyrics[has_lyrics].str.split().str.len().to_numpy(dtype=np.int64)
+    tokens = chars // 4  # 1 token ≈ 4 characters
     
     # Calculate statistics
     print("\n" + "=" * 70)
@@ -87,39 +124,42 @@ def analyze_lyrics_distribution(sample_size=100000):
     # Character statistics
     print(f"\n📝 CHARACTER COUNT:")
     print(f"   Mean:       {np.mean(chars):>10,.1f} characters")
-    print(f"   Median:     {np.median(chars):>10,.1f} characters")
+    p25, p50, p75, p95, p99 = np.quantile(chars, QUANTILES)
+    print(f"   Median:     {p50:>10,.1f} characters")
     print(f"   Std Dev:    {np.std(chars):>10,.1f}")
     print(f"   Min:        {np.min(chars):>10,} characters")
     print(f"   Max:        {np.max(chars):>10,} characters")
-    print(f"   25th %:     {np.percentile(chars, 25):>10,.1f} characters")
-    print(f"   50th %:     {np.percentile(chars, 50):>10,.1f} characters")
-    print(f"   75th %:     {np.percentile(chars, 75):>10,.1f} characters")
-    print(f"   95th %:     {np.percentile(chars, 95):>10,.1f} characters")
-    print(f"   99th %:     {np.percentile(chars, 99):>10,.1f} characters")
+    print(f"   25th %:     {p25:>10,.1f} characters")
+    print(f"   50th %:     {p50:>10,.1f} characters")
+    print(f"   75th %:     {p75:>10,.1f} characters")
+    print(f"   95th %:     {p95:>10,.1f} characters")
+    print(f"   99th %:     {p99:>10,.1f} characters")
     
     # Word statistics
     print(f"\n📖 WORD COUNT:")
     print(f"   Mean:       {np.mean(words):>10,.1f} words")
-    print(f"   Median:     {np.median(words):>10,.1f} words")
+    p25, p50, p75, p95, p99 = np.quantile(words, QUANTILES)
+    print(f"   Median:     {p50:>10,.1f} words")
     print(f"   Std Dev:    {np.std(words):>10,.1f}")
     print(f"   Min:        {np.min(words):>10,} words")
     print(f"   Max:        {np.max(words):>10,} words")
-    print(f"   25th %:     {np.percentile(words, 25):>10,.1f} words")
-    print(f"   75th %:     {np.percentile(words, 75):>10,.1f} words")
-    print(f"   95th %:     {np.percentile(words, 95):>10,.1f} words")
-    print(f"   99th %:     {np.percentile(words, 99):>10,.1f} words")
+    print(f"   25th %:     {p25:>10,.1f} words")
+    print(f"   75th %:     {p75:>10,.1f} words")
+    print(f"   95th %:     {p95:>10,.1f} words")
+    print(f"   99th %:     {p99:>10,.1f} words")
     
     # Token statistics (estimated)
     print(f"\n🔢 ESTIMATED TOKENS (1 token ≈ 4 chars):")
     print(f"   Mean:       {np.mean(tokens):>10,.1f} tokens")
-    print(f"   Median:     {np.median(tokens):>10,.1f} tokens")
+    p25, p50, p75, p95, p99 = np.quantile(tokens, QUANTILES)
+    print(f"   Median:     {p50:>10,.1f} tokens")
     print(f"   Std Dev:    {np.std(tokens):>10,.1f}")
     print(f"   Min:        {np.min(tokens):>10,} tokens")
     print(f"   Max:        {np.max(tokens):>10,} tokens")
-    print(f"   25th %:     {np.percentile(tokens, 25):>10,.1f} tokens")
-    print(f"   75th %:     {np.percentile(tokens, 75):>10,.1f} tokens")
-    print(f"   95th %:     {np.percentile(tokens, 95):>10,.1f} tokens")
-    print(f"   99th %:     {np.percentile(tokens, 99):>10,.1f} tokens")
+    print(f"   25th %:     {p25:>10,.1f} tokens")
+    print(f"   75th %:     {p75:>10,.1f} tokens")
+    print(f"   95th %:     {p95:>10,.1f} tokens")
+    print(f"   99th %:     {p99:>10,.1f} tokens")
     
     # Chunking analysis
     print(f"\n✂️  CHUNKING ANALYSIS (8,000 token threshold):")
@@ -141,11 +181,10 @@ def analyze_lyrics_distribution(sample_size=100000):
     bins = [0, 1000, 2000, 4000, 6000, 8000, 10000, 15000, 999999]
     labels = ['<1k', '1k-2k', '2k-4k', '4k-6k', '6k-8k', '8k-10k', '10k-15k', '>15k']
     
-    for i, label in enumerate(labels):
-        if i < len(bins) - 1:
-            count = np.sum((tokens >= bins[i]) & (tokens < bins[i+1]))
-            percentage = (count / len(tokens)) * 100
-            print(f"   {label:10} tokens: {count:>10,} songs ({percentage:>5.2f}%)")
+    counts, _ = np.histogram(tokens, bins=bins)
+    for label, count in zip(labels, counts):
+        percentage = (count / len(tokens)) * 100
+        print(f"   {label:10} tokens: {count:>10,} songs ({percentage:>5.2f}%)")
     
     # Storage estimate
     print(f"\n💾 STORAGE ESTIMATE (for full dataset):")
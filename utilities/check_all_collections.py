@@ -7,17 +7,17 @@ Check object counts in all collections.
 Shows if data was successfully copied.
 """
 
-import requests
+from concurrent.futures import ThreadPoolExecutor
 import config
+from weaviate_client import create_http_session
+
+# Shared session so all count queries reuse keep-alive connections
+SESSION = create_http_session(pool_maxsize=16, auth=True)
 
 
 def count_objects_in_collection(collection_name):
     """Count objects in a specific collection"""
     try:
-        headers = {"Content-Type": "application/json"}
-        if config.WEAVIATE_API_KEY and config.WEAVIATE_API_KEY != "your-weaviate-api-key":
-            headers["Authorization"] = f"Bearer {config.WEAVIATE_API_KEY}"
-        
         query = {
             "query": f"""
             {{
@@ -32,9 +32,8 @@ def count_objects_in_collection(collection_name):
             """
         }
         
-        response = requests.post(
+        response = SESSION.post(
             f"{config.WEAVIATE_URL}/v1/graphql",
-            headers=headers,
             json=query,
             timeout=30
         )
@@ -53,6 +52,49 @@ def count_objects_in_collection(collection_name):
         return None
 
 
+def count_objects_in_collections(collection_names):
+    """
+    Count objects in several collections with one aliased Aggregate query.
+    
+    Falls back to one query per collection if the batched query fails
+    (e.g. a missing collection makes the whole GraphQL query invalid),
+    running those queries in parallel.
+    
+    Returns:
+        Dict of collection name -> count (None on error)
+    """
+    # GraphQL aliases cannot start with a digit
+    aliases = [f"c{i}" for i in range(len(collection_names))]
+    
+    try:
+        fields = " ".join(
+            f"{alias}: {name} {{ meta {{ count }} }}"
+            for alias, name in zip(aliases, collection_names)
+        )
+        query = {"query": f"{{ Aggregate {{ {fields} }} }}"}
+        
+        response = SESSION.post(
+            f"{config.WEAVIATE_URL}/v1/graphql",
+            json=query,
+            timeout=30
+        )
+        
+        if response.status_code == 200:
+            result = response.json()
+            if not result.get("errors"):
+                aggregate = result.get("data", {}).get("Aggregate", {})
+                counts = {}
+                for alias, name in zip(aliases, collection_names):
+                    aggregate_data = aggregate.get(alias) or []
+                    counts[name] = aggregate_data[0].get("meta", {}).get("count", 0) if aggregate_data else 0
+                return counts
+    except Exception:
+        pass
+    
+    with ThreadPoolExecutor(max_workers=len(collection_names) or 1) as executor:
+        return dict(zip(collection_names, executor.map(count_objects_in_collection, collection_names)))
+
+
 def main():
     """Check all collections"""
     collections_to_check = [
@@ -74,11 +116,12 @@ def main():
     print("\nChecking all collections...")
     print("-" * 80)
     
-    results = []
-    
-    for name, expected, description in collections_to_check:
-        count = count_objects_in_collection(name)
-        results.append((name, expected, count, description))
+    counts = count_objects_in_collections([name for name, _, _ in collections_to_check])
+    results = [
+        (name, expected, counts[name], description)
+        for name, expected, description in collections_to_check
+    ]
+    by_name = {name: (expected, actual) for name, expected, actual, _ in results}
     
     # Display results
     print(f"\n{'Collection':<25} {'Expected':>12} {'Actual':>12} {'Status':>10} {'Description':<20}")
@@ -144,8 +187,7 @@ def main():
     if partial_collections:
         print(f"\n⚠️  Partially filled collections:")
         for name in partial_collections:
-            expected = next(exp for n, exp, _, _ in results if n == name)
-            actual = next(act for n, _, act, _ in results if n == name)
+            expected, actual = by_name[name]
             remaining = expected - actual if actual else expected
             print(f"      • {name}: {actual:,}/{expected:,} ({remaining:,} remaining)")
     
@@ -7,6 +7,14 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 from weaviate_client import create_weaviate_client
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+def fetch_shards(client, collection_name):
+    """Return (collection_name, sharding_state) or (collection_name, None) if missing"""
+    if not client.collections.exists(collection_name):
+        return collection_name, None
+    return collection_name, client.cluster.query_sharding_state(collection=collection_name)
 
 def main():
     print("╔" + "="*78 + "╗")
@@ -22,20 +30,21 @@ def main():
         'SongLyrics_15k', 'SongLyrics_12k', 'SongLyrics_10k'
     ]
     
-    node_stats = defaultdict(lambda: {'shards': 0, 'objects': 0, 'collections': []})
+    node_stats = defaultdict(lambda: {'shards': 0, 'objects': 0, 'collections': set()})
     
     try:
         print("🔍 Checking all collections...")
         print()
         
-        for collection_name in collections:
-            if not client.collections.exists(collection_name):
+        # Query sharding state for all collections concurrently
+        with ThreadPoolExecutor(max_workers=len(collections)) as executor:
+            results = list(executor.map(partial(fetch_shards, client), collections))
+        
+        for collection_name, sharding_state in results:
+            if sharding_state is None:
                 print(f"⚠️  {collection_name}: Does not exist")
                 continue
             
-            # Get sharding state
-            sharding_state = client.cluster.query_sharding_state(collection=collection_name)
-            
             for shard in sharding_state.shards:
                 nodes = shard.replicas if hasattr(shard, 'replicas') else []
                 obj_count = shard.object_count if hasattr(shard, 'object_count') else 0
@@ -43,8 +52,7 @@ def main():
                 for node in nodes:
                     node_stats[node]['shards'] += 1
                     node_stats[node]['objects'] += obj_count
-                    if collection_name not in node_stats[node]['collections']:
-                        node_stats[node]['collections'].append(collection_name)
+                    node_stats[node]['collections'].add(collection_name)
         
         print("=" * 78)
         print("🖥️  ACTUAL DISTRIBUTION")
@@ -29,6 +29,42 @@ def format_time_ago(iso_timestamp):
     except:
         return "Unknown"
 
+def count_lines(path, chunk_size=1 << 20):
+    """
+    Count lines in a file by scanning raw bytes in 1 MiB chunks.
+    
+    The result is cached in a '<path>.linecount.json' sidecar keyed on the
+    file size and mtime, so re-runs skip the scan until the file changes.
+    """
+    stat = os.stat(path)
+    cache_key = [stat.st_size, stat.st_mtime_ns]
+    cache_file = f"{path}.linecount.json"
+    
+    try:
+        with open(cache_file, 'r') as f:
+            cached = json.load(f)
+        if cached.get('key') == cache_key:
+            return cached['lines']
+    except (OSError, ValueError):
+        pass
+    
+    lines = 0
+    last_chunk = b''
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            lines += chunk.count(b'\n')
+            last_chunk = chunk
+    if last_chunk and not last_chunk.endswith(b'\n'):
+        lines += 1  # Final line without trailing newline
+    
+    try:
+        with open(cache_file, 'w') as f:
+            json.dump({'key': cache_key, 'lines': lines}, f)
+    except OSError:
+        pass
+    
+    return lines
+
 def main():
     checkpoint_file = config.CHECKPOINT_FILE
     
@@ -47,7 +83,7 @@ def main():
             csv_path = os.path.join(os.path.dirname(__file__), '..', csv_path)
         
         # Get total rows
-        total_rows = sum(1 for _ in open(csv_path)) - 1
+        total_rows = count_lines(csv_path) - 1
         
         last_row = state.get('last_processed_row', 0)
         total_processed = state.get('total_processed', 0)
@@ -1,8 +1,47 @@
+"""
+Print a per-node shard summary from the Weaviate /v1/nodes endpoint.
+
+Always requests output=verbose (minimal output has no per-node stats) and
+streams it; pass --verbose to also list every shard.
+Usage: python check_shard_distribution.py [--verbose]
+"""
+import sys
+
 import requests
 
+try:
+    import ijson
+except ImportError:
+    ijson = None  # Fall back to parsing the whole response
+
 WEAVIATE_URL = "http://20.161.96.75"
-resp = requests.get(f"{WEAVIATE_URL}/v1/nodes?output=verbose")
-resp.raise_for_status()
-data = resp.json()
-print(data)
 
+
+def iter_nodes():
+    """Yield node dicts, stream-parsing the response when ijson is available"""
+    resp = requests.get(f"{WEAVIATE_URL}/v1/nodes?output=verbose", stream=True, timeout=30)
+    resp.raise_for_status()
+
+    if ijson is None:
+        yield from resp.json().get("nodes", [])
+        return
+
+    resp.raw.decode_content = True
+    yield from ijson.items(resp.raw, "nodes.item")
+
+
+def main():
+    verbose = "--verbose" in sys.argv[1:]
+
+    for node in iter_nodes():
+        stats = node.get("stats") or {}
+        print(f"{node.get('name')}: status={node.get('status')} "
+              f"shards={stats.get('shardCount', 'N/A')} objects={stats.get('objectCount', 'N/A')}")
+
+        if verbose:
+            for shard in node.get("shards") or []:
+                print(f"   {shard.get('class')}/{shard.get('name')}: {shard.get('objectCount', 0)} objects")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,77 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-import requests
 import json
+import hashlib
+import pickle
+import time
+import argparse
 import config
+from weaviate_client import create_http_session
 
-def debug_nodes():
+# On-disk cache for the nodes/schema responses (repeated debugging runs)
+CACHE_DIR = os.path.join(os.path.dirname(__file__), '.debug_cache')
+CACHE_TTL = 30  # Seconds a cached response is used without any request
+
+def cached_get(session, url, ttl=CACHE_TTL, use_cache=True):
+    """
+    GET a JSON endpoint, caching the parsed body on disk.
+    
+    Within `ttl` seconds the cached body is returned without a request.
+    After that the request is revalidated with If-None-Match (when the
+    server sent an ETag) and a 304 reuses the cached body.
+    With use_cache=False the cache is neither read nor written.
+    
+    Returns:
+        Tuple of (status_code, parsed JSON on 200 / response text otherwise,
+        age in seconds of the cached body, or None if the server sent it)
+    """
+    cache_file = os.path.join(CACHE_DIR, hashlib.sha1(url.encode()).hexdigest() + '.pkl')
+    
+    cached = None
+    if use_cache:
+        try:
+            with open(cache_file, 'rb') as f:
+                cached = pickle.load(f)
+            age = time.time() - os.path.getmtime(cache_file)
+            if age < ttl:
+                return 200, cached['data'], age
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError):
+            cached = None
+    
+    headers = {}
+    if cached and cached.get('etag'):
+        headers['If-None-Match'] = cached['etag']
+    
+    response = session.get(url, headers=headers, timeout=30)
+    
+    if response.status_code == 304 and cached:
+        age = time.time() - os.path.getmtime(cache_file)
+        os.utime(cache_file)  # Revalidated - restart the TTL
+        return 304, cached['data'], age
+    if response.status_code != 200:
+        return response.status_code, response.text, None
+    
+    data = response.json()
+    if use_cache:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(cache_file, 'wb') as f:
+                pickle.dump({'etag': response.headers.get('ETag'), 'data': data}, f)
+        except OSError:
+            pass
+    
+    return 200, data, None
+
+def describe_source(status_code, cache_age):
+    """One-line description of where a cached_get response came from"""
+    if cache_age is None:
+        return f"Status Code: {status_code}"
+    if status_code == 304:
+        return f"Status Code: 304 (not modified) - body from .debug_cache (age {cache_age:.0f}s)"
+    return f"From .debug_cache (age {cache_age:.0f}s, no request sent) - use --no-cache for a live response"
+
+def debug_nodes(use_cache=True):
     """Show raw node data"""
     
     print("="*70)
@@ -17,25 +83,19 @@ def debug_nodes():
     print("="*70)
     print()
     
-    headers = {"Content-Type": "application/json"}
-    if config.WEAVIATE_API_KEY and config.WEAVIATE_API_KEY != "your-weaviate-api-key":
-        headers["Authorization"] = f"Bearer {config.WEAVIATE_API_KEY}"
+    # Reuse one keep-alive connection for the nodes and schema calls
+    session = create_http_session(pool_maxsize=4, auth=True)
     
     try:
-        response = requests.get(
-            f"{config.WEAVIATE_URL}/v1/nodes",
-            headers=headers,
-            timeout=30
-        )
+        status_code, data, cache_age = cached_get(session, f"{config.WEAVIATE_URL}/v1/nodes", use_cache=use_cache)
         
-        print(f"Status Code: {response.status_code}")
+        print(describe_source(status_code, cache_age))
         print()
         
-        if response.status_code == 200:
-            data = response.json()
+        if status_code in (200, 304):
             
             # Pretty print the raw JSON
-            print("Raw JSON Response:")
+            print("Raw JSON Response:" if cache_age is None else "Cached JSON Response:")
             print(json.dumps(data, indent=2))
             print()
             
@@ -44,14 +104,11 @@ def debug_nodes():
             print("Checking if collections exist via schema API:")
             print("="*70)
             
-            schema_response = requests.get(
-                f"{config.WEAVIATE_URL}/v1/schema",
-                headers=headers,
-                timeout=30
-            )
+            schema_status, schema, schema_age = cached_get(session, f"{config.WEAVIATE_URL}/v1/schema", use_cache=use_cache)
+            if schema_age is not None:
+                print(describe_source(schema_status, schema_age))
             
-            if schema_response.status_code == 200:
-                schema = schema_response.json()
+            if schema_status in (200, 304):
                 classes = schema.get('classes', [])
                 print(f"\nFound {len(classes)} collection(s):")
                 for cls in classes:
@@ -60,7 +117,7 @@ def debug_nodes():
                     print(f"    Replication: {cls.get('replicationConfig', {}).get('factor', 'N/A')}")
             
         else:
-            print(f"Error: {response.text}")
+            print(f"Error: {data}")
             
     except Exception as e:
         print(f"Error: {e}")
@@ -68,5 +125,10 @@ def debug_nodes():
         traceback.print_exc()
 
 if __name__ == "__main__":
-    debug_nodes()
+    parser = argparse.ArgumentParser(description='Show raw node data from the Weaviate API')
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f'Always query the server (skip {os.path.basename(CACHE_DIR)})')
+    args = parser.parse_args()
+    
+    debug_nodes(use_cache=not args.no_cache)
 
@@ -0,0 +1,53 @@
+"""
+Content-addressed embedding cache for test scripts.
+Embeddings are stored in SQLite (as float16, see vec_io) keyed by SHA-256 of
+the embedded text and the model name, so re-running a test on the same CSV
+skips the embeddings API.
+"""
+
+import os
+import hashlib
+import sqlite3
+from typing import List, Optional
+
+import vec_io
+
+CACHE_FILE = os.path.join(os.path.dirname(__file__), '.embed_cache.sqlite')
+
+
+class EmbeddingCache:
+    """SQLite-backed embedding cache (one connection reused across calls)"""
+
+    def __init__(self, path: str = CACHE_FILE):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "sha256 BLOB NOT NULL, model TEXT NOT NULL, dim INTEGER NOT NULL, vec BLOB NOT NULL, "
+            "PRIMARY KEY (sha256, model))"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def key(text: str) -> bytes:
+        return hashlib.sha256(text.encode()).digest()
+
+    def get(self, text: str, model: str) -> Optional[List[float]]:
+        """Return the cached embedding for text, or None on a miss"""
+        row = self.conn.execute(
+            "SELECT dim, vec FROM cache WHERE sha256 = ? AND model = ?", (self.key(text), model)
+        ).fetchone()
+        if row is None:
+            return None
+        return vec_io.from_bytes(row[1], row[0])
+
+    def put(self, text: str, model: str, vector: List[float]):
+        """Store an embedding (as float16, see vec_io) for text"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO cache (sha256, model, dim, vec) VALUES (?, ?, ?, ?)",
+            (self.key(text), model, len(vector), vec_io.to_bytes(vector))
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -9,9 +9,22 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 import json
 import argparse
-from openai_client import create_sync_openai_client
+import asyncio
+import numpy as np
+from openai_client import create_async_openai_client, create_sync_openai_client
 import config
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Fall back to stdlib json
+
+# Paths resolved once: query files and the embeddings cache live in performance_testing/
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(MODULE_DIR)
+PERF_DIR = os.path.join(PROJECT_ROOT, 'performance_testing')
+CACHE_FILE = os.path.join(PERF_DIR, 'embeddings_cache.npz')
+
 # Collections for multi-collection testing
 MULTI_COLLECTIONS = [
     'SongLyrics', 'SongLyrics_400k', 'SongLyrics_200k',
@@ -36,51 +49,144 @@ SEARCH_QUERIES = [
     "redemption forgiveness second chance"
 ]
 
+# Properties returned by every generated query
+RETURN_FIELDS = "title tag artist year views features lyrics song_id language_cld3 language_ft language"
+
+# Search types whose queries embed the query vector
+VECTOR_SEARCH_TYPES = ['hybrid_01', 'hybrid_09', 'vector', 'mixed']
+
+# Queries per embeddings request (Azure OpenAI caps inputs per request)
+EMBEDDING_BATCH_SIZE = 16
+
+# Concurrent single-query requests when batched input is not accepted
+MAX_CONCURRENT_EMBEDDING_REQUESTS = 10
+
+# JSON-serialized query vectors, keyed by query text (reused across types/limits)
+_vector_json_cache = {}
+
+
+def read_json(path):
+    """Load a JSON file, using orjson when available"""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def write_json(path, data, indent=False):
+    """Write data as JSON (optionally indented by 2), using orjson when available"""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0))
+        return
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2 if indent else None)
+
+
+def load_embeddings_cache(cache_file):
+    """Load {query: vector} from an .npz cache (or a legacy .json cache)"""
+    if cache_file.endswith('.json'):
+        return read_json(cache_file)
+    with np.load(cache_file) as data:
+        return dict(zip(data['queries'].tolist(), data['vecs'].tolist()))
+
+
+def save_embeddings_cache(cache_file, embeddings):
+    """
+    Save embeddings as binary arrays in an .npz file.
+    
+    Vectors are kept as float64 so cached values (and the query files built
+    from them) are identical to the freshly generated ones.
+    """
+    with open(cache_file, 'wb') as f:
+        np.savez(
+            f,
+            queries=np.array(SEARCH_QUERIES),
+            vecs=np.asarray([embeddings[q] for q in SEARCH_QUERIES], dtype=np.float64)
+        )
+
+
+async def embed_one(client, model, semaphore, query):
+    """Embed a single query, bounded by the shared semaphore"""
+    async with semaphore:
+        response = await client.embeddings.create(model=model, input=query)
+    return query, response.data[0].embedding
+
+
+async def embed_concurrently(queries):
+    """Embed queries with concurrent single-input requests (no batch input)"""
+    client, model = create_async_openai_client()
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_EMBEDDING_REQUESTS)
+    try:
+        results = await asyncio.gather(*(embed_one(client, model, semaphore, q) for q in queries))
+    finally:
+        await client.close()
+    return dict(results)
+
 
 def get_embeddings(cache_file=None):
     """Get embeddings for all queries (cached for reuse)"""
     
-    # Default cache file location: performance_testing/embeddings_cache.json
+    # Default cache file location: performance_testing/embeddings_cache.npz
     if cache_file is None:
-        cache_file = os.path.join(os.path.dirname(__file__), '..', 'performance_testing', 'embeddings_cache.json')
+        cache_file = CACHE_FILE
     
-    # Try to load from cache first
-    if os.path.exists(cache_file):
+    # Try to load from cache first (falling back to a legacy JSON cache)
+    legacy_cache_file = os.path.splitext(cache_file)[0] + '.json'
+    for path in dict.fromkeys([cache_file, legacy_cache_file]):
+        if not os.path.exists(path):
+            continue
         try:
-            print(f"\n📦 Loading cached embeddings from {cache_file}...")
-            with open(cache_file, 'r') as f:
-                embeddings = json.load(f)
+            print(f"\n📦 Loading cached embeddings from {path}...")
+            embeddings = load_embeddings_cache(path)
             
             # Verify all queries have embeddings
             if all(query in embeddings for query in SEARCH_QUERIES):
                 print(f"✅ Loaded {len(embeddings)} cached embeddings")
+                if path != cache_file:
+                    try:
+                        save_embeddings_cache(cache_file, embeddings)
+                    except Exception as e:
+                        print(f"⚠️  Could not convert cache to {cache_file}: {e}")
                 return embeddings
             else:
                 print("⚠️  Cache incomplete, regenerating...")
         except Exception as e:
             print(f"⚠️  Cache error: {e}, regenerating...")
     
-    # Generate fresh embeddings
-    print("\n🔄 Generating embeddings for 40 queries (this takes ~40 seconds)...")
+    # Generate fresh embeddings (batched: one request per EMBEDDING_BATCH_SIZE queries)
+    print(f"\n🔄 Generating embeddings for {len(SEARCH_QUERIES)} queries...")
     print("   These will be cached for future use!")
     
     client, model = create_sync_openai_client()
     embeddings = {}
     
-    for i, query in enumerate(SEARCH_QUERIES, 1):
-        print(f"  [{i}/40] {query}...", end=' ', flush=True)
+    for start in range(0, len(SEARCH_QUERIES), EMBEDDING_BATCH_SIZE):
+        batch = SEARCH_QUERIES[start:start + EMBEDDING_BATCH_SIZE]
+        end = start + len(batch)
+        print(f"  [{start + 1}-{end}/{len(SEARCH_QUERIES)}] {len(batch)} queries...", end=' ', flush=True)
         try:
-            response = client.embeddings.create(model=model, input=query)
-            embeddings[query] = response.data[0].embedding
+            response = client.embeddings.create(model=model, input=batch)
+            for item in response.data:
+                embeddings[batch[item.index]] = item.embedding
             print("✓")
         except Exception as e:
             print(f"❌ Error: {e}")
-            return None
+            # Deployment may not accept list input - embed the rest one query per request
+            remaining = [q for q in SEARCH_QUERIES if q not in embeddings]
+            print(f"  ↪ Falling back to {len(remaining)} concurrent single-query requests...", end=' ', flush=True)
+            try:
+                embeddings.update(asyncio.run(embed_concurrently(remaining)))
+                print("✓")
+            except Exception as e:
+                print(f"❌ Error: {e}")
+                return None
+            break
     
     # Save to cache
     try:
-        with open(cache_file, 'w') as f:
-            json.dump(embeddings, f)
+        save_embeddings_cache(cache_file, embeddings)
         print(f"\n💾 Saved embeddings to {cache_file} (will reuse next time)")
     except Exception as e:
         print(f"\n⚠️  Could not save cache: {e}")
@@ -88,76 +194,70 @@ def get_embeddings(cache_file=None):
     return embeddings
 
 
-def generate_bm25_query(query_text, collections, limit):
-    """Generate BM25 query for multiple collections"""
-    collection_queries = []
-    for collection in collections:
-        collection_queries.append(f'''
+def vector_json(query_text, query_vector):
+    """Serialize a query's vector to JSON once and reuse it for every query file"""
+    vector_str = _vector_json_cache.get(query_text)
+    if vector_str is None:
+        vector_str = _vector_json_cache[query_text] = json.dumps(query_vector)
+    return vector_str
+
+
+def _collection_block(collection, search_clause, limit, additional):
+    """Format one collection's search inside the Get wrapper"""
+    return f'''
         {collection}(
-          bm25: {{query: "{query_text}", properties: ["title", "lyrics"]}}
+          {search_clause}
           limit: {limit}
         ) {{
-          title tag artist year views features lyrics song_id language_cld3 language_ft language
-          _additional {{ score }}
-        }}''')
-    
-    all_collections = "\n        ".join(collection_queries)
+          {RETURN_FIELDS}
+          _additional {{ {additional} }}
+        }}'''
+
+
+def _wrap(blocks):
+    """Join per-collection blocks into a single Get query"""
+    all_collections = "\n        ".join(blocks)
     return f"{{ Get {{ {all_collections} }} }}"
 
 
+def generate_bm25_query(query_text, collections, limit):
+    """Generate BM25 query for multiple collections"""
+    clause = f'bm25: {{query: "{query_text}", properties: ["title", "lyrics"]}}'
+    return _wrap(_collection_block(collection, clause, limit, "score") for collection in collections)
+
+
 def generate_hybrid_query(query_text, query_vector, alpha, collections, limit):
     """Generate Hybrid query"""
-    vector_str = json.dumps(query_vector)
-    collection_queries = []
-    
-    for collection in collections:
-        collection_queries.append(f'''
-        {collection}(
-          hybrid: {{
+    vector_str = vector_json(query_text, query_vector)
+    clause = f'''hybrid: {{
             query: "{query_text}"
             alpha: {alpha}
             vector: {vector_str}
             properties: ["title", "lyrics"]
-          }}
-          limit: {limit}
-        ) {{
-          title tag artist year views features lyrics song_id language_cld3 language_ft language
-          _additional {{ score }}
-        }}''')
-    
-    all_collections = "\n        ".join(collection_queries)
-    return f"{{ Get {{ {all_collections} }} }}"
+          }}'''
+    return _wrap(_collection_block(collection, clause, limit, "score") for collection in collections)
 
 
-def generate_vector_query(query_vector, collections, limit):
+def generate_vector_query(query_text, query_vector, collections, limit):
     """Generate pure vector query"""
-    vector_str = json.dumps(query_vector)
-    collection_queries = []
-    
-    for collection in collections:
-        collection_queries.append(f'''
-        {collection}(
-          nearVector: {{vector: {vector_str}}}
-          limit: {limit}
-        ) {{
-          title tag artist year views features lyrics song_id language_cld3 language_ft language
-          _additional {{ distance certainty }}
-        }}''')
-    
-    all_collections = "\n        ".join(collection_queries)
-    return f"{{ Get {{ {all_collections} }} }}"
+    clause = f"nearVector: {{vector: {vector_json(query_text, query_vector)}}}"
+    return _wrap(_collection_block(collection, clause, limit, "distance certainty") for collection in collections)
 
 
-def generate_all_query_files(test_type, limit, collections, output_dir='.'):
-    """Generate query files for specific test type and limit"""
+def generate_all_query_files(test_type, limit, collections, output_dir='.', embeddings=None):
+    """
+    Generate query files for specific test type and limit.
+    
+    Pass `embeddings` (from get_embeddings()) when generating several files
+    so the cache is only loaded once.
+    """
     
     print(f"\n{'='*70}")
     print(f"Generating {test_type.upper()} queries (limit={limit})")
     print(f"{'='*70}")
     
     # Get embeddings if needed
-    embeddings = None
-    if test_type in ['hybrid_01', 'hybrid_09', 'vector', 'mixed']:
+    if embeddings is None and test_type in VECTOR_SEARCH_TYPES:
         embeddings = get_embeddings()
         if not embeddings:
             return False
@@ -197,7 +297,7 @@ def generate_all_query_files(test_type, limit, collections, output_dir='.'):
                 "query_text": query_text,
                 "search_type": "vector",
                 "limit": limit,
-                "graphql": generate_vector_query(embeddings[query_text], collections, limit)
+                "graphql": generate_vector_query(query_text, embeddings[query_text], collections, limit)
             })
     
     elif test_type == 'mixed':
@@ -215,7 +315,7 @@ def generate_all_query_files(test_type, limit, collections, output_dir='.'):
                 graphql = generate_hybrid_query(query_text, embeddings[query_text], 0.9, collections, limit)
             else:  # i % 4 == 3
                 search_type = 'vector'
-                graphql = generate_vector_query(embeddings[query_text], collections, limit)
+                graphql = generate_vector_query(query_text, embeddings[query_text], collections, limit)
             
             queries.append({
                 "query_text": query_text,
@@ -229,8 +329,7 @@ def generate_all_query_files(test_type, limit, collections, output_dir='.'):
     os.makedirs(queries_dir, exist_ok=True)
     
     filename = os.path.join(queries_dir, f"queries_{test_type}_{limit}.json")
-    with open(filename, 'w') as f:
-        json.dump(queries, f, indent=2)
+    write_json(filename, queries, indent=True)
     
     print(f"✅ Created: {filename} ({len(queries)} queries)")
     return True
@@ -251,27 +350,34 @@ def main():
     
     # Set collections based on type
     # Output directories are relative to performance_testing/
-    perf_testing_dir = os.path.join(os.path.dirname(__file__), '..', 'performance_testing')
     if args.type == 'multi':
         collections = MULTI_COLLECTIONS
-        output_dir = os.path.join(perf_testing_dir, 'multi_collection')
+        output_dir = os.path.join(PERF_DIR, 'multi_collection')
         print("Generating queries for MULTI-COLLECTION (9 collections)")
     else:
         collections = [config.WEAVIATE_CLASS_NAME]
-        output_dir = os.path.join(perf_testing_dir, 'single_collection')
+        output_dir = os.path.join(PERF_DIR, 'single_collection')
         print(f"Generating queries for SINGLE-COLLECTION ({config.WEAVIATE_CLASS_NAME})")
     
     print(f"Limits: {args.limits}")
     print(f"Search types: {args.search_types}")
     print("="*70)
     
+    # Load embeddings once for all vector-using types and limits
+    embeddings = None
+    if any(search_type in VECTOR_SEARCH_TYPES for search_type in args.search_types):
+        embeddings = get_embeddings()
+        if not embeddings:
+            print("❌ Failed to load or generate embeddings")
+            return 1
+    
     # Generate for each combination
     total = len(args.limits) * len(args.search_types)
     completed = 0
     
     for search_type in args.search_types:
         for limit in args.limits:
-            if generate_all_query_files(search_type, limit, collections, output_dir):
+            if generate_all_query_files(search_type, limit, collections, output_dir, embeddings):
                 completed += 1
             else:
                 print(f"❌ Failed to generate {search_type} limit {limit}")
@@ -1,20 +1,29 @@
-import weaviate
-import json
+import requests
+from collections import defaultdict
 
-# Connect to your Weaviate instance
-client = weaviate.Client("http://20.161.96.75")
+try:
+    import ijson
+except ImportError:
+    ijson = None  # Fall back to parsing the whole response
 
-# Fetch node information
-nodes_info = client.misc.get_nodes()
+WEAVIATE_URL = "http://20.161.96.75"
 
-# Pretty print shard distribution per node
-print(json.dumps(nodes_info, indent=2))
+# Fetch node information (verbose output includes per-node shards)
+resp = requests.get(f"{WEAVIATE_URL}/v1/nodes?output=verbose", stream=True, timeout=30)
+resp.raise_for_status()
 
-# Optional: Summarize shard distribution
-print("\n=== Shard Distribution Summary ===")
-for node in nodes_info['nodes']:
+if ijson is None:
+    nodes = resp.json().get('nodes', [])
+else:
+    resp.raw.decode_content = True
+    nodes = ijson.items(resp.raw, 'nodes.item')
+
+# Summarize shard distribution per node, one node at a time
+print("=== Shard Distribution Summary ===")
+for node in nodes:
     print(f"\n🖥️ Node: {node['name']} ({node['status']})")
-    for class_name, shards in node.get('shards', {}).items():
-        shard_names = [shard['name'] for shard in shards]
+    shards_by_class = defaultdict(list)
+    for shard in node.get('shards') or []:
+        shards_by_class[shard['class']].append(shard['name'])
+    for class_name, shard_names in shards_by_class.items():
         print(f"  • {class_name}: {', '.join(shard_names)}")
-
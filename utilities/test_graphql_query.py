@@ -6,17 +6,46 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
 import config
+from weaviate_client import create_http_session
+
+try:
+    import ijson
+except ImportError:
+    ijson = None  # Fall back to parsing the whole response
+
+
+def scan_vector_response(response, class_name):
+    """Stream the vector probe body, keeping only the first object's title,
+    vector length and first two components (the vector is never materialized)"""
+    item = f"data.Get.{class_name}.item"
+    found, title, length, sample, errors = False, "N/A", 0, [], []
+    
+    response.raw.decode_content = True
+    for prefix, event, value in ijson.parse(response.raw):
+        if prefix == item:
+            if event == "end_map":
+                break
+            found = True
+        elif prefix == f"{item}.title":
+            title = value
+        elif prefix == f"{item}._additional.vector.item":
+            length += 1
+            if len(sample) < 2:
+                sample.append(value)
+        elif prefix == "errors.item.message":
+            errors.append(value)
+    
+    return found, title, length, sample, errors
 
 
 def test_query():
     """Test if we can fetch objects from SongLyrics"""
     
-    headers = {"Content-Type": "application/json"}
-    if config.WEAVIATE_API_KEY and config.WEAVIATE_API_KEY != "your-weaviate-api-key":
-        headers["Authorization"] = f"Bearer {config.WEAVIATE_API_KEY}"
+    # One keep-alive session shared by all probes
+    session = create_http_session(pool_maxsize=4, auth=True)
     
     print("=" * 70)
     print("GRAPHQL QUERY TEST")
@@ -25,7 +54,6 @@ def test_query():
     print(f"Source Collection: {config.WEAVIATE_CLASS_NAME}")
     
     # Test 1: Simple count query
-    print("\n1️⃣  Testing count query...")
     count_query = {
         "query": f"""
         {{
@@ -40,31 +68,7 @@ def test_query():
         """
     }
     
-    response = requests.post(
-        f"{config.WEAVIATE_URL}/v1/graphql",
-        headers=headers,
-        json=count_query,
-        timeout=30
-    )
-    
-    if response.status_code == 200:
-        result = response.json()
-        if "errors" in result:
-            print(f"   ❌ GraphQL errors: {result['errors']}")
-        else:
-            count_data = result.get("data", {}).get("Aggregate", {}).get(config.WEAVIATE_CLASS_NAME, [])
-            if count_data:
-                count = count_data[0].get("meta", {}).get("count", 0)
-                print(f"   ✅ Collection has {count:,} objects")
-            else:
-                print(f"   ❌ Could not get count")
-                print(f"   Response: {json.dumps(result, indent=2)}")
-    else:
-        print(f"   ❌ Request failed: {response.status_code}")
-        print(f"   Response: {response.text}")
-    
     # Test 2: Fetch first 5 objects
-    print("\n2️⃣  Testing fetch query (first 5 objects)...")
     fetch_query = {
         "query": f"""
         {{
@@ -82,13 +86,53 @@ def test_query():
         """
     }
     
-    response = requests.post(
-        f"{config.WEAVIATE_URL}/v1/graphql",
-        headers=headers,
-        json=fetch_query,
-        timeout=30
-    )
+    # Test 3: Fetch with vector
+    vector_query = {
+        "query": f"""
+        {{
+          Get {{
+            {config.WEAVIATE_CLASS_NAME}(limit: 2) {{
+              title
+              _additional {{
+                id
+                vector
+              }}
+            }}
+          }}
+        }}
+        """
+    }
+    
+    # The probes are independent - send them concurrently, report in order
+    def post_query(query, stream=False):
+        return session.post(f"{config.WEAVIATE_URL}/v1/graphql", json=query, timeout=30, stream=stream)
     
+    # Only the vector probe is large enough to be worth streaming
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        count_response, fetch_response, vector_response = executor.map(
+            post_query, [count_query, fetch_query, vector_query], [False, False, ijson is not None]
+        )
+    
+    print("\n1️⃣  Testing count query...")
+    response = count_response
+    if response.status_code == 200:
+        result = response.json()
+        if "errors" in result:
+            print(f"   ❌ GraphQL errors: {result['errors']}")
+        else:
+            count_data = result.get("data", {}).get("Aggregate", {}).get(config.WEAVIATE_CLASS_NAME, [])
+            if count_data:
+                count = count_data[0].get("meta", {}).get("count", 0)
+                print(f"   ✅ Collection has {count:,} objects")
+            else:
+                print(f"   ❌ Could not get count")
+                print(f"   Response: {json.dumps(result, indent=2)}")
+    else:
+        print(f"   ❌ Request failed: {response.status_code}")
+        print(f"   Response: {response.text}")
+    
+    print("\n2️⃣  Testing fetch query (first 5 objects)...")
+    response = fetch_response
     if response.status_code == 200:
         result = response.json()
         if "errors" in result:
@@ -114,32 +158,25 @@ def test_query():
         print(f"   ❌ Request failed: {response.status_code}")
         print(f"   Response: {response.text}")
     
-    # Test 3: Fetch with vector
     print("\n3️⃣  Testing fetch query WITH vector...")
-    vector_query = {
-        "query": f"""
-        {{
-          Get {{
-            {config.WEAVIATE_CLASS_NAME}(limit: 2) {{
-              title
-              _additional {{
-                id
-                vector
-              }}
-            }}
-          }}
-        }}
-        """
-    }
-    
-    response = requests.post(
-        f"{config.WEAVIATE_URL}/v1/graphql",
-        headers=headers,
-        json=vector_query,
-        timeout=30
-    )
-    
-    if response.status_code == 200:
+    response = vector_response
+    if response.status_code == 200 and ijson is not None:
+        found, title, length, sample, errors = scan_vector_response(response, config.WEAVIATE_CLASS_NAME)
+        if errors:
+            print(f"   ❌ GraphQL errors:")
+            for message in errors:
+                print(f"      • {message}")
+        elif found:
+            print(f"   ✅ Successfully fetched object with vector")
+            print(f"      Title: {title}")
+            print(f"      Vector length: {length} dimensions")
+            if length > 0:
+                print(f"      Vector sample: [{sample[0]:.4f}, {sample[1]:.4f}, ...]")
+            else:
+                print(f"      ⚠️  Vector is empty!")
+        else:
+            print(f"   ⚠️  No objects returned")
+    elif response.status_code == 200:
         result = response.json()
         if "errors" in result:
             print(f"   ❌ GraphQL errors:")
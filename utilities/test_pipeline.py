@@ -7,33 +7,109 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
+import argparse
 import asyncio
+from functools import lru_cache
+import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+except ImportError:
+    pa = None  # Fall back to the pandas C parser
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None  # Truncate by characters instead of tokens
+
 import config
+from embed_cache import EmbeddingCache
 from openai_client import create_async_openai_client
-from weaviate_client import create_weaviate_client, insert_single_object, batch_insert_objects
+from weaviate_client import (
+    get_shared_weaviate_client, get_http_session, insert_single_object_async, batch_insert_objects, dumps_payload
+)
 
 # Number of test rows to process
 TEST_ROWS = 5
 
+# CSV columns by target type; 'id' is stored as the song_id property
+TEXT_COLUMNS = ['title', 'tag', 'artist', 'features', 'lyrics', 'id', 'language_cld3', 'language_ft', 'language']
+INT_COLUMNS = ['year', 'views']
+
+# Bytes parsed per pyarrow block (a few test rows fit in the first block)
+CSV_BLOCK_SIZE = 1 << 20
+
+# Embedding input limit (model maximum is 8191 tokens)
+MAX_EMBED_TOKENS = 8000
+
+# Property order of the indexed objects
+PROPERTY_COLUMNS = ['title', 'tag', 'artist', 'year', 'views', 'features', 'lyrics', 'song_id',
+                    'language_cld3', 'language_ft', 'language']
+
+
+@lru_cache(maxsize=1)
+def get_encoder():
+    """
+    Load the text-embedding-3-* / ada-002 tokenizer on first use.
+    Returns None when tiktoken is missing or its BPE file cannot be loaded.
+    """
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        print(f"  ⚠️  Tokenizer unavailable ({e}), truncating by characters")
+        return None
+
+
+def truncate_text(text):
+    """Cut text to MAX_EMBED_TOKENS tokens (characters when tiktoken is unavailable)"""
+    # A token spans at least one UTF-8 byte, so short texts need no tokenizer
+    if len(text.encode()) <= MAX_EMBED_TOKENS:
+        return text
+    encoder = get_encoder()
+    if encoder is None:
+        return text[:MAX_EMBED_TOKENS]
+    tokens = encoder.encode(text, disallowed_special=())
+    if len(tokens) <= MAX_EMBED_TOKENS:
+        return text
+    return encoder.decode(tokens[:MAX_EMBED_TOKENS])
+
 
 class PipelineTester:
     """Tests the complete pipeline with a small sample"""
     
-    def __init__(self):
+    def __init__(self, use_embed_cache=False):
         # Initialize OpenAI client using centralized module
         self.openai_client, self.embedding_model = create_async_openai_client()
         print(f"✓ Using embedding model: {self.embedding_model}")
         
         self.weaviate_client = None
+        self.semaphore = asyncio.Semaphore(config.MAX_CONCURRENT_EMBEDDINGS)
+        
+        # Opt-in: with the cache on, re-runs do not verify the embeddings API
+        self.embed_cache = EmbeddingCache() if use_embed_cache else None
+        if self.embed_cache:
+            print(f"⚠️  Embedding cache enabled - cached lyrics skip the embeddings API")
+    
+    def cached_embedding(self, text):
+        """Return the cached embedding for text (None on a miss or with the cache off)"""
+        if self.embed_cache is None:
+            return None
+        return self.embed_cache.get(text, self.embedding_model)
+    
+    def cache_embedding(self, text, embedding):
+        if self.embed_cache is not None:
+            self.embed_cache.put(text, self.embedding_model, embedding)
     
     def connect_weaviate(self):
         """Connect to Weaviate using centralized client"""
         print("\n📊 Connecting to Weaviate...")
         try:
-            # Use centralized client creation
-            self.weaviate_client = create_weaviate_client()
+            # Use the process-wide shared client (closed at exit)
+            self.weaviate_client = get_shared_weaviate_client()
             
             if not self.weaviate_client.collections.exists(config.WEAVIATE_CLASS_NAME):
                 print(f"❌ Collection '{config.WEAVIATE_CLASS_NAME}' does not exist!")
@@ -59,7 +135,7 @@ class PipelineTester:
             if not os.path.isabs(csv_path):
                 csv_path = os.path.join(os.path.dirname(__file__), '..', csv_path)
             
-            df = pd.read_csv(csv_path, nrows=TEST_ROWS)
+            df = self.read_csv_head(csv_path)
             print(f"✓ Read {len(df)} rows")
             print(f"  Columns: {list(df.columns)}")
             return df
@@ -67,17 +143,78 @@ class PipelineTester:
             print(f"❌ Failed to read CSV: {e}")
             return None
     
-    async def get_embedding(self, text: str):
-        """Get embedding for text"""
+    def read_csv_head(self, csv_path):
+        """
+        Read the first TEST_ROWS rows, keeping only config.CSV_COLUMNS.
+        
+        With pyarrow, record batches are streamed until enough rows are read,
+        so the rest of the file is never parsed.
+        """
+        if pa is None:
+            return pd.read_csv(csv_path, nrows=TEST_ROWS, usecols=lambda col: col in config.CSV_COLUMNS)
+        
+        reader = pacsv.open_csv(
+            csv_path,
+            read_options=pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+            parse_options=pacsv.ParseOptions(newlines_in_values=True),
+            convert_options=pacsv.ConvertOptions(include_columns=config.CSV_COLUMNS,
+                                                 include_missing_columns=True)
+        )
+        batches = []
+        rows = 0
+        for batch in reader:
+            batches.append(batch)
+            rows += batch.num_rows
+            if rows >= TEST_ROWS:
+                break
+        return pa.Table.from_batches(batches, schema=reader.schema).slice(0, TEST_ROWS).to_pandas()
+    
+    async def get_embeddings_batch(self, texts):
+        """Get embeddings for several texts, requesting all cache misses at once"""
+        texts = [truncate_text(text) for text in texts]
+        embeddings = [self.cached_embedding(text) for text in texts]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if len(missing) < len(texts):
+            print(f"({len(texts) - len(missing)} from local cache) ", end="", flush=True)
+        if not missing:
+            return embeddings
+        
         try:
             response = await self.openai_client.embeddings.create(
                 model=self.embedding_model,
-                input=text[:8000]  # Limit text length
+                input=[texts[i] for i in missing]
             )
-            return response.data[0].embedding
         except Exception as e:
             print(f"  ❌ Embedding failed: {e}")
             return None
+        
+        for item in response.data:
+            i = missing[item.index]
+            embeddings[i] = item.embedding
+            self.cache_embedding(texts[i], item.embedding)
+        return embeddings
+    
+    async def get_embedding(self, text: str):
+        """Get embedding for text"""
+        text = truncate_text(text)
+        embedding = self.cached_embedding(text)
+        if embedding is not None:
+            print("  → Embedding from local cache")
+            return embedding
+        
+        async with self.semaphore:  # Limit concurrent requests
+            try:
+                response = await self.openai_client.embeddings.create(
+                    model=self.embedding_model,
+                    input=text
+                )
+            except Exception as e:
+                print(f"  ❌ Embedding failed: {e}")
+                return None
+        
+        embedding = response.data[0].embedding
+        self.cache_embedding(text, embedding)
+        return embedding
     
     async def process_and_index(self, df):
         """Process rows and index to Weaviate - Tests BOTH single and batch insert"""
@@ -92,40 +229,58 @@ class PipelineTester:
         all_data = []
         all_embeddings = []
         
-        for idx, row in df.iterrows():
-            try:
-                # Clean data
-                data = {
-                    'title': str(row.get('title', '')),
-                    'tag': str(row.get('tag', '')),
-                    'artist': str(row.get('artist', '')),
-                    'year': int(row.get('year', 0)) if pd.notna(row.get('year')) else 0,
-                    'views': int(row.get('views', 0)) if pd.notna(row.get('views')) else 0,
-                    'features': str(row.get('features', '')),
-                    'lyrics': str(row.get('lyrics', '')),
-                    'song_id': str(row.get('id', '')),
-                    'language_cld3': str(row.get('language_cld3', '')),
-                    'language_ft': str(row.get('language_ft', '')),
-                    'language': str(row.get('language', ''))
-                }
-                
-                print(f"\n[{idx+1}/{len(df)}] {data['title']} by {data['artist']}")
-                
-                # Get embedding
-                print(f"  → Getting embedding... ", end="", flush=True)
-                embedding = await self.get_embedding(data['lyrics'])
-                if embedding is None:
-                    print("❌ Failed")
-                    error_count += 1
-                    continue
-                print(f"✓ ({len(embedding)} dims)")
-                
-                all_data.append(data)
-                all_embeddings.append(embedding)
-                
-            except Exception as e:
-                print(f"  ❌ Error: {e}")
+        # Clean data column by column (missing columns become ''/0)
+        try:
+            clean = df.reindex(columns=TEXT_COLUMNS + INT_COLUMNS)
+            for col in INT_COLUMNS:
+                # Unparseable values (e.g. stray text) become 0 instead of failing the batch
+                clean[col] = pd.to_numeric(clean[col], errors='coerce').fillna(0).astype(np.int64)
+            for col in TEXT_COLUMNS:
+                clean[col] = clean[col].astype('string').fillna('')
+            # Skip rows with empty lyrics (the embeddings API rejects empty input)
+            has_lyrics = clean['lyrics'].str.strip() != ''
+            for song_id in clean.loc[~has_lyrics, 'id']:
+                print(f"  ⚠️  Skipping row with empty lyrics: ID={song_id}")
                 error_count += 1
+            clean = clean[has_lyrics]
+            rows = clean.rename(columns={'id': 'song_id'})[PROPERTY_COLUMNS].to_dict(orient='records')
+        except Exception as e:
+            print(f"  ❌ Error: {e}")
+            error_count += len(df)
+            rows = []
+        
+        # Embed each distinct lyrics text once (covers/remixes repeat lyrics)
+        unique_index = {}
+        for data in rows:
+            unique_index.setdefault(data['lyrics'], len(unique_index))
+        unique_texts = list(unique_index)
+        
+        # Get all embeddings in one request
+        embeddings = []
+        if unique_texts:
+            print(f"  → Getting {len(unique_texts)} embeddings in one request "
+                  f"({len(rows) - len(unique_texts)} duplicate lyrics skipped)... ", end="", flush=True)
+            unique_embeddings = await self.get_embeddings_batch(unique_texts)
+            if unique_embeddings is None:
+                # Deployment rejected batched input - send single requests concurrently
+                print(f"  → Falling back to {len(unique_texts)} concurrent requests...")
+                unique_embeddings = await asyncio.gather(
+                    *[self.get_embedding(text) for text in unique_texts],
+                    return_exceptions=True
+                )
+            else:
+                print("✓")
+            embeddings = [unique_embeddings[unique_index[data['lyrics']]] for data in rows]
+        
+        for i, (data, embedding) in enumerate(zip(rows, embeddings), 1):
+            print(f"\n[{i}/{len(rows)}] {data['title']} by {data['artist']} ", end="")
+            if embedding is None or isinstance(embedding, Exception):
+                print("❌ Failed")
+                error_count += 1
+                continue
+            print(f"✓ ({len(embedding)} dims)")
+            all_data.append(data)
+            all_embeddings.append(embedding)
         
         # Now test both insertion methods
         print("\n" + "=" * 70)
@@ -139,9 +294,13 @@ class PipelineTester:
         if split_point > 0:
             print(f"\n🔸 Test 1: Single Insert (insert_single_object)")
             print(f"   Testing with {split_point} row(s)...")
-            for i in range(split_point):
-                print(f"   [{i+1}/{split_point}] Inserting: {all_data[i]['title'][:30]}... ", end="", flush=True)
-                result_id = insert_single_object(all_data[i], all_embeddings[i])
+            # Inserts are independent - run them concurrently on the insert executor
+            result_ids = await asyncio.gather(*[
+                insert_single_object_async(all_data[i], all_embeddings[i])
+                for i in range(split_point)
+            ])
+            for i, result_id in enumerate(result_ids):
+                print(f"   [{i+1}/{split_point}] Inserting: {all_data[i]['title'][:30]}... ", end="")
                 if result_id:
                     print(f"✓ {result_id[:8]}...")
                     indexed_ids.append(result_id)
@@ -168,7 +327,7 @@ class PipelineTester:
             
             # Do batch insert
             print(f"   → Sending batch of {remaining} objects... ", end="", flush=True)
-            batch_success, batch_errors = batch_insert_objects(batch_objects)
+            batch_success, batch_errors = batch_insert_objects(batch_objects, client=self.weaviate_client)
             print(f"✓ Done")
             print(f"   ✓ Batch insert complete: {batch_success} successful, {batch_errors} errors")
             
@@ -197,14 +356,13 @@ class PipelineTester:
         print("=" * 70)
         
         try:
-            import requests
+            session = get_http_session()
             
             headers = {"Content-Type": "application/json"}
             if config.WEAVIATE_API_KEY and config.WEAVIATE_API_KEY != "your-weaviate-api-key":
                 headers["Authorization"] = f"Bearer {config.WEAVIATE_API_KEY}"
             
-            # Test 1: GraphQL query (BM25 search)
-            print("\n1. BM25 Search Test: 'love songs'")
+            # BM25 search and object count in one GraphQL request
             graphql_query = {
                 "query": """
                 {
@@ -217,20 +375,40 @@ class PipelineTester:
                       artist
                     }
                   }
+                  Aggregate {
+                    """ + config.WEAVIATE_CLASS_NAME + """ {
+                      meta {
+                        count
+                      }
+                    }
+                  }
                 }
                 """
             }
             
-            response = requests.post(
-                f"{config.WEAVIATE_URL}/v1/graphql",
-                headers=headers,
-                json=graphql_query,
-                timeout=30
+            # The GraphQL query and the REST fetch by UUID run concurrently
+            graphql_response, object_response = await asyncio.gather(
+                asyncio.to_thread(
+                    session.post,
+                    f"{config.WEAVIATE_URL}/v1/graphql",
+                    headers=headers,
+                    data=dumps_payload(graphql_query),
+                    timeout=30
+                ),
+                asyncio.to_thread(
+                    session.get,
+                    f"{config.WEAVIATE_URL}/v1/objects/{indexed_ids[0]}",
+                    headers=headers,
+                    timeout=30
+                )
             )
+            result = graphql_response.json() if graphql_response.status_code == 200 else {}
+            data = result.get("data") or {}
             
-            if response.status_code == 200:
-                result = response.json()
-                objects = result.get("data", {}).get("Get", {}).get(config.WEAVIATE_CLASS_NAME, [])
+            # Test 1: GraphQL query (BM25 search)
+            print("\n1. BM25 Search Test: 'love songs'")
+            if graphql_response.status_code == 200:
+                objects = (data.get("Get") or {}).get(config.WEAVIATE_CLASS_NAME, [])
                 if objects:
                     print(f"   ✓ Found {len(objects)} results:")
                     for i, obj in enumerate(objects, 1):
@@ -238,52 +416,23 @@ class PipelineTester:
                 else:
                     print("   ⚠️  No results found")
             else:
-                print(f"   ❌ Search failed: {response.status_code}")
+                print(f"   ❌ Search failed: {graphql_response.status_code}")
             
             # Test 2: Get by ID
             print(f"\n2. Fetch by UUID Test")
-            test_id = indexed_ids[0]
-            response = requests.get(
-                f"{config.WEAVIATE_URL}/v1/objects/{test_id}",
-                headers=headers,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                obj = response.json()
+            if object_response.status_code == 200:
+                obj = object_response.json()
                 print(f"   ✓ Retrieved: {obj.get('properties', {}).get('title', 'N/A')}")
             else:
                 print("   ❌ Failed to retrieve")
             
-            # Test 3: Count total objects via GraphQL
+            # Test 3: Count total objects (same GraphQL response)
             print(f"\n3. Count total objects in collection")
-            count_query = {
-                "query": """
-                {
-                  Aggregate {
-                    """ + config.WEAVIATE_CLASS_NAME + """ {
-                      meta {
-                        count
-                      }
-                    }
-                  }
-                }
-                """
-            }
-            
-            response = requests.post(
-                f"{config.WEAVIATE_URL}/v1/graphql",
-                headers=headers,
-                json=count_query,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                count = result.get("data", {}).get("Aggregate", {}).get(config.WEAVIATE_CLASS_NAME, [{}])[0].get("meta", {}).get("count", 0)
+            if graphql_response.status_code == 200:
+                count = ((data.get("Aggregate") or {}).get(config.WEAVIATE_CLASS_NAME) or [{}])[0].get("meta", {}).get("count", 0)
                 print(f"   ✓ Total objects: {count}")
             else:
-                print(f"   ⚠️  Count failed: {response.status_code}")
+                print(f"   ⚠️  Count failed: {graphql_response.status_code}")
             
             print("=" * 70)
             print("✅ All search tests completed!")
@@ -325,14 +474,14 @@ class PipelineTester:
     
     async def close(self):
         """Cleanup"""
-        if self.weaviate_client:
-            self.weaviate_client.close()
+        if self.embed_cache:
+            self.embed_cache.close()
         await self.openai_client.close()
 
 
-async def main():
+async def main(use_embed_cache=False):
     """Main entry point"""
-    tester = PipelineTester()
+    tester = PipelineTester(use_embed_cache=use_embed_cache)
     
     try:
         success = await tester.run()
@@ -351,11 +500,16 @@ async def main():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='End-to-end pipeline test')
+    parser.add_argument('--use-embed-cache', action='store_true',
+                        help='Reuse embeddings cached by earlier runs (skips the embeddings API check)')
+    args = parser.parse_args()
+    
     print("\n" + "=" * 70)
     print("  END-TO-END PIPELINE TEST")
     print(f"  Testing with {TEST_ROWS} rows from CSV")
     print("=" * 70 + "\n")
     
     # Run the async main function
-    asyncio.run(main())
+    asyncio.run(main(use_embed_cache=args.use_embed_cache))
 
@@ -0,0 +1,29 @@
+"""
+Compact on-disk storage for embedding vectors.
+Vectors are stored as float16 (half the size of float32) and read back as
+float32, so a cached vector sent to Weaviate carries float16-rounded values.
+For OpenAI embeddings that rounding leaves cosine similarity effectively
+unchanged (~1e-4).
+"""
+
+from typing import List
+
+import numpy as np
+
+STORAGE_DTYPE = np.float16
+
+
+def to_bytes(vector) -> bytes:
+    """Encode one vector as float16 bytes"""
+    return np.asarray(vector, dtype=STORAGE_DTYPE).tobytes()
+
+
+def from_bytes(blob: bytes, dim: int) -> List[float]:
+    """
+    Decode a vector stored by to_bytes.
+    The element width is derived from the blob size, so float32 blobs
+    written before the float16 switch still decode correctly.
+    """
+    dtype = np.float16 if len(blob) == dim * 2 else np.float32
+    return np.frombuffer(blob, dtype=dtype).astype(np.float32).tolist()
+
@@ -11,7 +11,7 @@ import sys
 import logging
 import config
 from openai_client import create_sync_openai_client
-from weaviate_client import create_weaviate_client
+from weaviate_client import get_shared_weaviate_client
 
 # Setup logging for verify_setup
 logging.basicConfig(level=logging.WARNING)  # Only show warnings and errors
@@ -51,8 +51,8 @@ def test_weaviate():
     """Test Weaviate connection using centralized client"""
     print("\nTesting Weaviate connection...")
     try:
-        # Use centralized client creation
-        client = create_weaviate_client()
+        # Use the process-wide shared client (closed at exit)
+        client = get_shared_weaviate_client()
         
         # Test if server is reachable
         if client.is_ready():
@@ -67,11 +67,9 @@ def test_weaviate():
                 print(f"   ⚠️  Collection '{config.WEAVIATE_CLASS_NAME}' does not exist")
                 print("      Run 'python create_weaviate_schema.py' to create it")
             
-            client.close()
             return True
         else:
             print("❌ Weaviate server not ready")
-            client.close()
             return False
             
     except Exception as e:
@@ -98,9 +96,9 @@ def test_csv():
             print(f"   Note: CSV file should be in project root: song_lyrics.csv")
             return False
         
-        # Try to read first row
+        # Read the header only - the column check needs no row data
         import pandas as pd
-        df = pd.read_csv(csv_path, nrows=1)
+        df = pd.read_csv(csv_path, nrows=0)
         print(f"✅ CSV file accessible!")
         print(f"   Path: {config.CSV_FILE_PATH}")
         print(f"   Columns: {list(df.columns)}")
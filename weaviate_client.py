@@ -8,9 +8,18 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
+import asyncio
+import atexit
+import json
 import logging
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from urllib.parse import urlparse
 import requests
 from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
 from urllib3.util.retry import Retry
 import weaviate
 from weaviate.connect import ConnectionParams
@@ -18,11 +27,117 @@ from typing import List, Dict, Any, Optional, Tuple
 
 import config
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Fall back to stdlib json
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None  # Fall back to building dicts for dumps_payload
+
 logger = logging.getLogger(__name__)
 
 # Global session for connection pooling and reuse
 _http_session = None
 
+# Single inserts run on a shared executor, each worker thread with its own session
+_thread_local = threading.local()
+_insert_executor = None
+
+# urllib3 defaults (TCP_NODELAY) plus TCP keep-alive so idle pooled sockets survive
+SOCKET_OPTIONS = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+
+
+def as_vector_list(vector) -> List[float]:
+    """Normalize a vector (list or numpy array) to a plain list, so every encoder writes the same JSON"""
+    return vector.tolist() if hasattr(vector, 'tolist') else vector
+
+
+def dumps_payload(payload) -> bytes:
+    """Serialize a REST request body (orjson formats vector floats in C)"""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload).encode()
+
+
+if msgspec is not None:
+    class BatchObject(msgspec.Struct, rename={"class_": "class"}):
+        """One object of a REST batch request"""
+        class_: str
+        properties: Dict[str, Any]
+        vector: Any
+    
+    class BatchRequest(msgspec.Struct):
+        """REST /v1/batch/objects request body"""
+        objects: List[BatchObject]
+    
+    _batch_encoder = msgspec.json.Encoder()
+
+
+def encode_batch_payload(objects: List[Dict[str, Any]], collection_name: str) -> bytes:
+    """Serialize the REST batch body (typed msgspec structs when available)"""
+    if msgspec is not None:
+        return _batch_encoder.encode(BatchRequest([
+            BatchObject(collection_name, obj['properties'], as_vector_list(obj['vector'])) for obj in objects
+        ]))
+    return dumps_payload({"objects": [
+        {"class": collection_name, "properties": obj['properties'], "vector": as_vector_list(obj['vector'])}
+        for obj in objects
+    ]})
+
+
+class SocketOptionsAdapter(HTTPAdapter):
+    """HTTPAdapter that applies SOCKET_OPTIONS to every pooled connection"""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['socket_options'] = SOCKET_OPTIONS
+        super().init_poolmanager(*args, **kwargs)
+
+
+def create_http_session(pool_maxsize: int = 4, auth: bool = False) -> requests.Session:
+    """
+    Build a requests session with retry logic and keep-alive connection pooling.
+    
+    Args:
+        pool_maxsize: Connections kept per host
+        auth: Also send the JSON Content-Type and (if configured) the API key on every request
+    """
+    session = requests.Session()
+    
+    # Configure retry strategy
+    retry_strategy = Retry(
+        total=3,
+        backoff_factor=1,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["HEAD", "GET", "POST", "PUT", "DELETE", "OPTIONS", "TRACE"]
+    )
+    
+    # Mount adapter with retry strategy
+    adapter = SocketOptionsAdapter(
+        max_retries=retry_strategy,
+        pool_connections=64,        # Hosts kept in the pool manager
+        pool_maxsize=pool_maxsize,  # Connections per host
+        pool_block=False
+    )
+    
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    
+    # Set keep-alive
+    session.headers.update({
+        'Connection': 'keep-alive',
+        'Keep-Alive': 'timeout=60, max=1000'
+    })
+    
+    if auth:
+        session.headers["Content-Type"] = "application/json"
+        if config.WEAVIATE_API_KEY and config.WEAVIATE_API_KEY != "your-weaviate-api-key":
+            session.headers["Authorization"] = f"Bearer {config.WEAVIATE_API_KEY}"
+    
+    return session
+
 
 def get_http_session():
     """
@@ -32,38 +147,48 @@ def get_http_session():
     global _http_session
     
     if _http_session is None:
-        _http_session = requests.Session()
-        
-        # Configure retry strategy
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["HEAD", "GET", "POST", "PUT", "DELETE", "OPTIONS", "TRACE"]
-        )
-        
-        # Mount adapter with retry strategy
-        adapter = HTTPAdapter(
-            max_retries=retry_strategy,
-            pool_connections=10,  # Keep 10 connections alive
-            pool_maxsize=20,      # Max pool size
-            pool_block=False
-        )
-        
-        _http_session.mount("http://", adapter)
-        _http_session.mount("https://", adapter)
-        
-        # Set keep-alive
-        _http_session.headers.update({
-            'Connection': 'keep-alive',
-            'Keep-Alive': 'timeout=60, max=1000'
-        })
-        
+        _http_session = create_http_session(pool_maxsize=256)  # Covers concurrent batch inserts
         logger.info("Created HTTP session with connection pooling and retry logic")
     
     return _http_session
 
 
+def _get_thread_session():
+    """Per-thread session for single inserts; its warm connections stay with the thread"""
+    session = getattr(_thread_local, 'session', None)
+    if session is None:
+        session = _thread_local.session = create_http_session(pool_maxsize=4)
+    return session
+
+
+@lru_cache(maxsize=1)
+def _build_connection_params() -> ConnectionParams:
+    """
+    Parse config.WEAVIATE_URL once and build the client's ConnectionParams.
+    In HTTP-only mode the gRPC port is a placeholder that is never used.
+    """
+    url = config.WEAVIATE_URL
+    parsed = urlparse(url if "://" in url else f"http://{url}")
+    is_https = parsed.scheme == "https"
+    host = parsed.hostname
+    port = parsed.port or (443 if is_https else 80)
+    
+    if getattr(config, 'WEAVIATE_USE_GRPC', False):
+        grpc_port, grpc_secure = 50051, is_https
+    else:
+        # Must provide different port for validation but won't actually use gRPC
+        grpc_port, grpc_secure = (port + 1 if port < 65535 else port - 1), False
+    
+    return ConnectionParams.from_params(
+        http_host=host,
+        http_port=port,
+        http_secure=is_https,
+        grpc_host=host,
+        grpc_port=grpc_port,
+        grpc_secure=grpc_secure
+    )
+
+
 def create_weaviate_client():
     """
     Create and connect to Weaviate client.
@@ -74,19 +199,8 @@ def create_weaviate_client():
         Connected Weaviate client
     """
     try:
-        # Parse URL to extract protocol, host, and port
-        url = config.WEAVIATE_URL
-        is_https = url.startswith("https://")
-        url_without_protocol = url.replace("https://", "").replace("http://", "")
-        
-        # Split host and port
-        if ":" in url_without_protocol:
-            host, port_str = url_without_protocol.split(":", 1)
-            port_str = port_str.split("/")[0]
-            port = int(port_str)
-        else:
-            host = url_without_protocol.split("/")[0]
-            port = 443 if is_https else 80
+        connection_params = _build_connection_params()
+        host, port, is_https = connection_params.http.host, connection_params.http.port, connection_params.http.secure
         
         # Check if authentication is needed
         use_auth = config.WEAVIATE_API_KEY and config.WEAVIATE_API_KEY != "your-weaviate-api-key"
@@ -97,45 +211,21 @@ def create_weaviate_client():
         use_grpc = getattr(config, 'WEAVIATE_USE_GRPC', False)
         
         if use_grpc:
-            # gRPC enabled
-            logger.info(f"  gRPC enabled: {host}:50051")
-            import weaviate.classes.init as wvc_init
-            client = weaviate.WeaviateClient(
-                connection_params=ConnectionParams.from_params(
-                    http_host=host,
-                    http_port=port,
-                    http_secure=is_https,
-                    grpc_host=host,
-                    grpc_port=50051,
-                    grpc_secure=is_https
-                ),
-                auth_client_secret=weaviate.auth.AuthApiKey(config.WEAVIATE_API_KEY) if use_auth else None,
-                skip_init_checks=True,
-                additional_config=wvc_init.AdditionalConfig(
-                    timeout=wvc_init.Timeout(init=30, query=60, insert=120)
-                )
-            )
+            logger.info(f"  gRPC enabled: {host}:{connection_params.grpc.port}")
+            init_timeout = 30
         else:
-            # HTTP-only mode (no gRPC)
             logger.info(f"  gRPC disabled (HTTP-only mode)")
-            # Must provide different port for validation but won't actually use gRPC
-            dummy_grpc_port = port + 1 if port < 65535 else port - 1
-            import weaviate.classes.init as wvc_init
-            client = weaviate.WeaviateClient(
-                connection_params=ConnectionParams.from_params(
-                    http_host=host,
-                    http_port=port,
-                    http_secure=is_https,
-                    grpc_host=host,
-                    grpc_port=dummy_grpc_port,
-                    grpc_secure=False
-                ),
-                auth_client_secret=weaviate.auth.AuthApiKey(config.WEAVIATE_API_KEY) if use_auth else None,
-                skip_init_checks=True,
-                additional_config=wvc_init.AdditionalConfig(
-                    timeout=wvc_init.Timeout(init=5, query=60, insert=120)  # Short init timeout
-                )
+            init_timeout = 5  # Short init timeout
+        
+        import weaviate.classes.init as wvc_init
+        client = weaviate.WeaviateClient(
+            connection_params=connection_params,
+            auth_client_secret=weaviate.auth.AuthApiKey(config.WEAVIATE_API_KEY) if use_auth else None,
+            skip_init_checks=True,
+            additional_config=wvc_init.AdditionalConfig(
+                timeout=wvc_init.Timeout(init=init_timeout, query=60, insert=120)
             )
+        )
         
         try:
             client.connect()
@@ -152,14 +242,80 @@ def create_weaviate_client():
         raise
 
 
-def batch_insert_objects(objects: List[Dict[str, Any]], collection_name: str = None) -> Tuple[int, int]:
+@lru_cache(maxsize=1)
+def get_shared_weaviate_client():
+    """
+    Return one connected client shared by every caller in this process.
+    Callers must not close it; it is closed at interpreter exit.
+    """
+    return create_weaviate_client()
+
+
+def _close_shared_client():
+    if get_shared_weaviate_client.cache_info().currsize:
+        get_shared_weaviate_client().close()
+
+
+atexit.register(_close_shared_client)
+
+def _reset_after_fork():
+    """A forked child must not reuse the parent's connections or worker threads"""
+    global _http_session, _insert_executor, _thread_local
+    get_shared_weaviate_client.cache_clear()
+    _prepared_batch_request.cache_clear()  # Rebuilt from the child's fresh session
+    _http_session = None
+    _insert_executor = None
+    _thread_local = threading.local()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+@lru_cache(maxsize=1)
+def _prepared_batch_request() -> requests.PreparedRequest:
+    """Batch insert POST with URL and session/auth headers prepared once (no body)"""
+    headers = {"Content-Type": "application/json"}
+    if config.WEAVIATE_API_KEY and config.WEAVIATE_API_KEY != "your-weaviate-api-key":
+        headers["Authorization"] = f"Bearer {config.WEAVIATE_API_KEY}"
+    
+    request = requests.Request(
+        'POST', f"{config.WEAVIATE_URL}/v1/batch/objects?consistency_level=ONE", headers=headers
+    )
+    return get_http_session().prepare_request(request)
+
+
+def _grpc_insert_many(client, objects: List[Dict[str, Any]], collection_name: str) -> Tuple[int, int]:
+    """Insert objects with the client's gRPC insert_many (protobuf, no JSON vectors)"""
+    from weaviate.classes.config import ConsistencyLevel
+    from weaviate.classes.data import DataObject
+    
+    if not objects:
+        return 0, 0
+    
+    collection = client.collections.get(collection_name).with_consistency_level(ConsistencyLevel.ONE)
+    result = collection.data.insert_many([
+        DataObject(properties=obj['properties'], vector=obj['vector']) for obj in objects
+    ])
+    
+    for error in result.errors.values():
+        logger.error(f"Batch insert error: {error.message}")
+    
+    return len(objects) - len(result.errors), len(result.errors)
+
+
+def batch_insert_objects(objects: List[Dict[str, Any]], collection_name: str = None,
+                         client=None) -> Tuple[int, int]:
     """
-    Insert multiple objects into Weaviate using REST API batch endpoint.
-    Uses connection pooling to avoid 'Connection refused' errors.
+    Insert multiple objects into Weaviate.
+    Uses the client's gRPC batch path when a client is given and WEAVIATE_USE_GRPC
+    is enabled, otherwise (or if the gRPC call fails) the REST API batch endpoint
+    with connection pooling.
     
     Args:
         objects: List of objects to insert, each with 'properties' and 'vector'
         collection_name: Collection name (defaults to config.WEAVIATE_CLASS_NAME)
+        client: Connected Weaviate client (optional, required for gRPC)
     
     Returns:
         Tuple of (success_count, error_count)
@@ -167,37 +323,26 @@ def batch_insert_objects(objects: List[Dict[str, Any]], collection_name: str = N
     if collection_name is None:
         collection_name = config.WEAVIATE_CLASS_NAME
     
+    if client is not None and getattr(config, 'WEAVIATE_USE_GRPC', False):
+        try:
+            return _grpc_insert_many(client, objects, collection_name)
+        except Exception as e:
+            # The client may exist without a gRPC connection - REST still works
+            logger.warning(f"gRPC batch insert failed ({e}), falling back to REST")
+    
     success_count = 0
     error_count = 0
     
     try:
-        # Prepare batch payload for REST API
-        batch_payload = []
-        for obj in objects:
-            batch_payload.append({
-                "class": collection_name,
-                "properties": obj['properties'],
-                "vector": obj['vector']
-            })
-        
-        if not batch_payload:
+        if not objects:
             return 0, 0
         
-        # Get reusable session with connection pooling
-        session = get_http_session()
-        
-        # Prepare headers
-        headers = {"Content-Type": "application/json"}
-        if config.WEAVIATE_API_KEY and config.WEAVIATE_API_KEY != "your-weaviate-api-key":
-            headers["Authorization"] = f"Bearer {config.WEAVIATE_API_KEY}"
+        # Copy the prepared request (URL and headers resolved once) and attach the body
+        request = _prepared_batch_request().copy()
+        request.prepare_body(encode_batch_payload(objects, collection_name), None)
         
         # Send batch insert request using session (reuses connections)
-        response = session.post(
-            f"{config.WEAVIATE_URL}/v1/batch/objects?consistency_level=ONE",
-            headers=headers,
-            json={"objects": batch_payload},
-            timeout=120
-        )
+        response = get_http_session().send(request, timeout=120)
         
         # Process response
         if response.status_code == 200:
@@ -212,10 +357,10 @@ def batch_insert_objects(objects: List[Dict[str, Any]], collection_name: str = N
             
             # If no explicit errors, assume all succeeded
             if success_count == 0 and error_count == 0:
-                success_count = len(batch_payload)
+                success_count = len(objects)
         else:
             logger.error(f"Batch insert failed: {response.status_code} - {response.text}")
-            error_count = len(batch_payload)
+            error_count = len(objects)
         
         return success_count, error_count
         
@@ -247,8 +392,8 @@ def insert_single_object(properties: Dict[str, Any], vector: List[float],
         collection_name = config.WEAVIATE_CLASS_NAME
     
     try:
-        # Get reusable session
-        session = get_http_session()
+        # Get this thread's reusable session
+        session = _get_thread_session()
         
         headers = {"Content-Type": "application/json"}
         if config.WEAVIATE_API_KEY and config.WEAVIATE_API_KEY != "your-weaviate-api-key":
@@ -257,13 +402,13 @@ def insert_single_object(properties: Dict[str, Any], vector: List[float],
         payload = {
             "class": collection_name,
             "properties": properties,
-            "vector": vector
+            "vector": as_vector_list(vector)
         }
         
         response = session.post(
             f"{config.WEAVIATE_URL}/v1/objects?consistency_level=ONE",
             headers=headers,
-            json=payload,
+            data=dumps_payload(payload),
             timeout=30
         )
         
@@ -279,6 +424,24 @@ def insert_single_object(properties: Dict[str, Any], vector: List[float],
         return None
 
 
+def insert_single_object_async(properties: Dict[str, Any], vector: List[float],
+                               collection_name: str = None) -> "asyncio.Future[Optional[str]]":
+    """
+    Run insert_single_object on the shared insert executor.
+    
+    Returns:
+        Awaitable resolving to the object UUID if successful, None otherwise
+    """
+    global _insert_executor
+    
+    if _insert_executor is None:
+        _insert_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="weaviate-insert")
+    
+    return asyncio.wrap_future(
+        _insert_executor.submit(insert_single_object, properties, vector, collection_name)
+    )
+
+
 def get_collection(client, collection_name: str = None):
     """
     Get a Weaviate collection.
@@ -301,4 +464,3 @@ def get_collection(client, collection_name: str = None):
     except Exception as e:
         logger.error(f"Error getting collection: {e}")
         raise
-